@@ -7,12 +7,27 @@ for more details.
 """
 
 import datetime
+import os
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import logging
 
+import numpy as np
+
+from firepit import get_storage
 from firepit.timestamp import to_datetime
 from kestrel.syntax.reference import value_to_stix
-from firepit.query import Column, Join, Query, Projection, Table, Unique
+from firepit.query import (
+    Column,
+    Filter,
+    Join,
+    Predicate,
+    Query,
+    Projection,
+    Table,
+    Unique,
+)
 
 _logger = logging.getLogger(__name__)
 
@@ -101,57 +116,132 @@ stix_x_ibm_event_mapping = {
     "x-oca-asset": "host_ref",
 }
 
+# reverse index into stix_2_0_ref_mapping for relation enumeration
+# type(_relations_by_pair) == {(return_type, input_type): [(relation, is_reversed)]}
+_relations_by_pair = defaultdict(list)
+for (_entity_x, _relation, _entity_y) in stix_2_0_ref_mapping.keys():
+    _relations_by_pair[(_entity_x, _entity_y)].append((_relation, False))
+    _relations_by_pair[(_entity_y, _entity_x)].append((_relation, True))
+
+# pre-rendered comparison expression suffixes, e.g. ".parent_ref.id" or
+# ".opened_connection_refs[*].id", so pattern generation is a plain join
+# type(_ref_suffixes) == {(entity_x, relation, entity_y): [suffix]}
+_ref_suffixes = {
+    _key: [
+        f".{_ref}[*].id" if _ref.endswith("_refs") else f".{_ref}.id"
+        for _ref in _src_refs + _tgt_refs
+    ]
+    for _key, (_src_refs, _tgt_refs) in stix_2_0_ref_mapping.items()
+}
+
+# suffixes of all relations merged per entity pair so the generic compile
+# path is a single dict lookup plus one join at runtime
+# type(_generic_suffixes) == {(return_type, input_type): [suffix]}
+_generic_suffixes = {
+    _pair: [
+        _suffix
+        for (_relation, _is_reversed) in _pair_relations
+        for _suffix in _ref_suffixes[
+            (
+                (_pair[1], _relation, _pair[0])
+                if _is_reversed
+                else (_pair[0], _relation, _pair[1])
+            )
+        ]
+    ]
+    for _pair, _pair_relations in _relations_by_pair.items()
+}
+
 # no direction for generic relations
 generic_relations = ["linked"]
 
-all_relations = list(
-    set([x[1] for x in stix_2_0_ref_mapping.keys() if x[1]] + generic_relations)
+all_relations = frozenset(
+    [x[1] for x in stix_2_0_ref_mapping.keys() if x[1]] + generic_relations
 )
 
 
+# caches of per-store query results used in entity id attribute resolution
+# keyed on the store object identity so results are not shared across stores
+# only valid while the underlying views are unchanged: the session clears
+# them before each statement since a statement can re-assign a variable view
+# type(_entity_columns_cache) == {(store_id, entity_table): [column]}
+# type(_id_attr_cache) == {(store_id, entity_table, entity_type): attribute}
+_entity_columns_cache = {}
+_id_attr_cache = {}
+
+
+def clear_relations_caches():
+    """Clear cached store query results; call before data in a store may change."""
+    _entity_columns_cache.clear()
+    _id_attr_cache.clear()
+
+
+def _get_entity_columns(store, entity_table):
+    columns_key = (id(store), entity_table)
+    columns = _entity_columns_cache.get(columns_key)
+    if columns is None:
+        columns = store.columns(entity_table)
+        _entity_columns_cache[columns_key] = columns
+    return columns
+
+
 def get_entity_id_attribute(variable):
     # this function should always return something
     # if no entity id attribute found, fall back to record "id" by default
     # this works for:
     #   - no appriparite identifier attribute found given specific data
     #   - "network-traffic" (not in stix_2_0_identical_mapping)
+    cache_key = (id(variable.store), variable.entity_table, variable.type)
+    if cache_key in _id_attr_cache:
+        return _id_attr_cache[cache_key]
+
     id_attr = "id"
 
     if variable.type in stix_2_0_identical_mapping:
-        available_attributes = variable.store.columns(variable.entity_table)
-        for attr in stix_2_0_identical_mapping[variable.type]:
-            if attr in available_attributes:
-                query = Query()
-                query.append(Table(variable.entity_table))
-                query.append(Projection([attr]))
-                query.append(Unique())
-                rows = variable.store.run_query(query).fetchall()
-                all_values = [row[attr] for row in rows if row[attr]]
-                if all_values:
+        available_attributes = _get_entity_columns(
+            variable.store, variable.entity_table
+        )
+        candidate_attrs = [
+            attr
+            for attr in stix_2_0_identical_mapping[variable.type]
+            if attr in available_attributes
+        ]
+        if candidate_attrs:
+            # probe all candidate attributes in one query instead of one per attr
+            query = Query(
+                [
+                    Table(variable.entity_table),
+                    Projection(candidate_attrs),
+                    Unique(),
+                ]
+            )
+            rows = variable.store.run_query(query).fetchall()
+            for attr in candidate_attrs:
+                if any(row[attr] for row in rows):
                     id_attr = attr
                     break
 
+    _id_attr_cache[cache_key] = id_attr
     return id_attr
 
 
 def are_entities_associated_with_x_ibm_event(entity_types):
-    flags = [entity_type in stix_x_ibm_event_mapping for entity_type in entity_types]
-    return all(flags)
+    return all(entity_type in stix_x_ibm_event_mapping for entity_type in entity_types)
 
 
+@lru_cache(maxsize=1024)
 def compile_generic_relation_to_pattern(return_type, input_type, input_var_name):
-    comp_exps = []
-    for relation, is_reversed in _enumerate_relations_between_entities(
-        return_type, input_type
-    ):
-        comp_exps += _generate_paramstix_comparison_expressions(
-            return_type, relation, input_type, is_reversed, input_var_name
-        )
+    comp_exps = [
+        f"{return_type}:id = {input_var_name}{suffix}"
+        for suffix in _generic_suffixes.get((return_type, input_type), [])
+    ]
     pattern = "[" + " OR ".join(comp_exps) + "]"
-    _logger.debug(f"generic relation pattern compiled: {pattern}")
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(f"generic relation pattern compiled: {pattern}")
     return pattern
 
 
+@lru_cache(maxsize=1024)
 def compile_specific_relation_to_pattern(
     return_type, relation, input_type, is_reversed, input_var_name
 ):
@@ -159,7 +249,8 @@ def compile_specific_relation_to_pattern(
         return_type, relation, input_type, is_reversed, input_var_name
     )
     pattern = "[" + " OR ".join(comp_exps) + "]"
-    _logger.debug(f"specific relation pattern compiled: {pattern}")
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(f"specific relation pattern compiled: {pattern}")
     return pattern
 
 
@@ -171,35 +262,36 @@ def compile_identical_entity_search_pattern(var_name, var_struct, does_support_i
         pattern_raw = None
     else:
         pattern_raw = f"[{var_struct.type}:{attribute} = {var_name}.{attribute}]"
-    _logger.debug(f"identical entity search raw pattern generated: {pattern_raw}")
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(f"identical entity search raw pattern generated: {pattern_raw}")
     return pattern_raw
 
 
+@lru_cache(maxsize=1024)
 def compile_x_ibm_event_search_flow_in_pattern(input_type, input_var_name):
     ref = stix_x_ibm_event_mapping[input_type]
     pattern = f"[x-oca-event:{ref}.id = {input_var_name}.id]"
-    _logger.debug(f"x-oca-event flow in pattern compiled: {pattern}")
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(f"x-oca-event flow in pattern compiled: {pattern}")
     return pattern
 
 
+@lru_cache(maxsize=1024)
 def compile_x_ibm_event_search_flow_out_pattern(return_type, input_event_var_name):
     ref = stix_x_ibm_event_mapping[return_type]
     pattern = f"[{return_type}:id = {input_event_var_name}.{ref}.id]"
-    _logger.debug(f"x-oca-event flow out pattern compiled: {pattern}")
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(f"x-oca-event flow out pattern compiled: {pattern}")
     return pattern
 
 
 def _enumerate_relations_between_entities(return_type, input_type):
     # return: [(relation, is_reversed)]
-    relations = []
-    for (x, r, y) in stix_2_0_ref_mapping.keys():
-        if x == return_type and y == input_type:
-            relations.append((r, False))
-        if y == return_type and x == input_type:
-            relations.append((r, True))
-    _logger.debug(
-        f'enumerated relations between "{return_type}" and "{input_type}": {relations}'
-    )
+    relations = _relations_by_pair.get((return_type, input_type), [])
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(
+            f'enumerated relations between "{return_type}" and "{input_type}": {relations}'
+        )
     return relations
 
 
@@ -210,22 +302,10 @@ def _generate_paramstix_comparison_expressions(
         (input_type, return_type) if is_reversed else (return_type, input_type)
     )
 
-    stix_src_refs, stix_tgt_refs = stix_2_0_ref_mapping[(entity_x, relation, entity_y)]
-
-    comp_exps = []
-    for stix_ref in stix_src_refs:
-        if stix_ref.endswith("_refs"):
-            comp_exps.append(f"{return_type}:id = {input_var_name}.{stix_ref}[*].id")
-        else:
-            comp_exps.append(f"{return_type}:id = {input_var_name}.{stix_ref}.id")
-
-    for stix_ref in stix_tgt_refs:
-        if stix_ref.endswith("_refs"):
-            comp_exps.append(f"{return_type}:id = {input_var_name}.{stix_ref}[*].id")
-        else:
-            comp_exps.append(f"{return_type}:id = {input_var_name}.{stix_ref}.id")
-
-    return comp_exps
+    return [
+        f"{return_type}:id = {input_var_name}{suffix}"
+        for suffix in _ref_suffixes[(entity_x, relation, entity_y)]
+    ]
 
 
 def fine_grained_relational_process_filtering(
@@ -245,44 +325,35 @@ def fine_grained_relational_process_filtering(
     #   most datasource does not store *parent parent process pid* for deref to get ppid
     #   of the parent. In this case, we need to search for anchor_rows to infer the ppid.
 
-    _logger.debug(
-        f"start fine-grained relational process filtering for prefetched table: {prefetch_entity_table}"
-    )
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(
+            f"start fine-grained relational process filtering for prefetched table: {prefetch_entity_table}"
+        )
 
     # reference processes obtained from de-referring data in firepit
-    # type(ref_processes) == {pid: (rid, (pname, ppid, start_time, end_time))}
-    ref_processes = _query_process_with_time_and_ppid(store, local_var.entity_table)
-
+    # type(ref_processes) == {pid: (rid_lists, pnames, ppids, start_times, end_times)}
     # prefetched processes to be filtered
-    # type(pfeh_processes) == {pid: (rid, (pname, ppid, start_time, end_time))}
-    pfeh_processes = _query_process_with_time_and_ppid(store, prefetch_entity_table)
-
-    # 1. anchor process search (a subset of pfeh_processes that matches ref_processes)
-    # type(anchor_processes) == {pid: (rid, (pname, ppid, start_time, end_time))}
-    anchor_processes = _search_for_potential_identical_process(
-        ref_processes, pfeh_processes, config
+    # type(pfeh_processes) == {pid: (rid_lists, pnames, ppids, start_times, end_times)}
+    ref_processes, pfeh_processes = _query_process_tables_in_parallel(
+        store, local_var.entity_table, prefetch_entity_table
     )
 
-    anchor_proc_cnt = sum(map(len, anchor_processes.values()))
-    prefetched_proc_cnt = sum(map(len, pfeh_processes.values()))
-    _logger.debug(
-        f"found {anchor_proc_cnt} anchor rows out of {prefetched_proc_cnt} raw prefetched."
-    )
+    # convert the config offsets once for both search passes
+    offsets = _config_offsets_in_us(config)
 
-    # 2. precise process search (a larger subset of pfeh_processes that matches anchor_processes)
-    # type(anchor_processes) == {pid: (rid, (pname, ppid, start_time, end_time))}
-    filtered_processes = _search_for_potential_identical_process(
-        anchor_processes, pfeh_processes, config
+    filtered_ids, anchor_proc_cnt, prefetched_proc_cnt = (
+        _search_for_potential_identical_process(ref_processes, pfeh_processes, offsets)
     )
 
-    filtered_ids = [rid for procs in filtered_processes.values() for rid, _ in procs]
-    filtered_ids = list(set(filtered_ids))
-
-    _logger.debug(
-        f"found {len(filtered_ids)} out of {prefetched_proc_cnt} raw prefetched results to be true relational process records."
-    )
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(
+            f"found {anchor_proc_cnt} anchor rows out of {prefetched_proc_cnt} raw prefetched."
+        )
+        _logger.debug(
+            f"found {len(filtered_ids)} out of {prefetched_proc_cnt} raw prefetched results to be true relational process records."
+        )
 
-    return filtered_ids
+    return list(filtered_ids)
 
 
 def build_pattern_from_ids(return_type, ids):
@@ -294,8 +365,88 @@ def build_pattern_from_ids(return_type, ids):
         return None
 
 
-def _query_process_with_time_and_ppid(store, var_table_name):
-    pid2procs = defaultdict(list)
+def _query_process_tables_in_parallel(store, ref_table_name, pfeh_table_name):
+    # firepit queries cannot be UNIONed across two views, so overlap the two
+    # round trips instead; a SQLite connection is bound to the thread that
+    # created it, so the prefetched table is queried on its own connection
+    # to the same database file
+    # timestamp strings repeat heavily across records, so both queries share
+    # one parsed-timestamp cache (dict operations are GIL-atomic)
+    ts_cache = {}
+    dbname = getattr(store, "dbname", None)
+    if store.dialect == "sqlite3" and dbname and os.path.isfile(dbname):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pfeh_future = executor.submit(
+                _query_process_table_on_own_connection,
+                dbname,
+                pfeh_table_name,
+                ts_cache,
+                ref_table_name,
+            )
+            ref_processes = _query_process_with_time_and_ppid(
+                store, ref_table_name, ts_cache
+            )
+            pfeh_processes = pfeh_future.result()
+    else:
+        ref_processes = _query_process_with_time_and_ppid(
+            store, ref_table_name, ts_cache
+        )
+        pfeh_processes = _query_process_with_time_and_ppid(
+            store, pfeh_table_name, ts_cache, semi_join_table_name=ref_table_name
+        )
+    return ref_processes, pfeh_processes
+
+
+def _query_process_table_on_own_connection(
+    dbname, var_table_name, ts_cache, semi_join_table_name
+):
+    store = get_storage(dbname)
+    try:
+        return _query_process_with_time_and_ppid(
+            store, var_table_name, ts_cache, semi_join_table_name
+        )
+    finally:
+        store.connection.close()
+
+
+def _to_us_timestamp_cached(timestamp, ts_cache):
+    # int64 POSIX microseconds: time-window checks become plain integer
+    # comparisons instead of datetime object arithmetic
+    us = ts_cache.get(timestamp)
+    if us is None:
+        try:
+            # C-implemented fast path for ISO-8601 timestamps
+            dt = datetime.datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        except ValueError:
+            dt = to_datetime(timestamp)
+        if dt.tzinfo is None:
+            # tz-less timestamps are UTC; timestamp() on a naive datetime
+            # would interpret it in the machine's local timezone
+            dt = dt.replace(tzinfo=datetime.timezone.utc)
+        us = ts_cache[timestamp] = int(dt.timestamp() * 1_000_000)
+    return us
+
+
+def _new_proc_group():
+    # columnar (structure-of-arrays) process record group: parallel lists
+    # (rid_lists, pnames, ppids, start_times, end_times) indexed by record
+    # position; each position is one unique (pname, ppid, start, end)
+    # combination carrying the rids of all records sharing it; times are
+    # int64 POSIX microseconds
+    return ([], [], [], [], [])
+
+
+def _query_process_with_time_and_ppid(
+    store, var_table_name, ts_cache, semi_join_table_name=None
+):
+    # plain dict (not defaultdict): lookups on absent pids in the search
+    # must not silently insert empty groups
+    # type(pid2procs) == {pid: (rid_lists, pnames, ppids, start_times, end_times)}
+    pid2procs = {}
+    # comparison-key deduplication: records identical in everything but rid
+    # match the same reference rows, so evaluate them once and fan out rids
+    # type(proc_index) == {(pid, pname, ppid, start_time, end_time): position}
+    proc_index = {}
 
     if "parent_ref" in store.columns(var_table_name):
         has_parent_ref = True
@@ -327,90 +478,221 @@ def _query_process_with_time_and_ppid(store, var_table_name):
     if has_parent_ref:
         projection_details.append(Column("pid", "process", "ppid"))
 
+    if semi_join_table_name:
+        # records whose pid never occurs in the reference table cannot
+        # match, so drop them in the database instead of in Python
+        query_details.append(
+            Filter(
+                [
+                    Predicate(
+                        Column("pid", var_table_name),
+                        "IN",
+                        Query(
+                            [
+                                Table(semi_join_table_name),
+                                Projection(["pid"]),
+                                Unique(),
+                            ]
+                        ),
+                    )
+                ]
+            )
+        )
+
     query_details.append(Projection(projection_details))
 
     query = Query(query_details)
 
-    rows = store.run_query(query).fetchall()
+    # positional tuples in projection order:
+    # (rid, pid, pname, first_observed, last_observed[, ppid])
+    rows = _fetch_rows_positional(store, query, has_parent_ref)
 
     for row in rows:
-        if row["pid"]:
-            rid = row["id"]
-            pname = row["name"]
-            ppid = row["ppid"] if has_parent_ref else None
-            st = to_datetime(row["first_observed"])
-            ed = to_datetime(row["last_observed"])
-            pid2procs[row["pid"]].append((rid, (pname, ppid, st, ed)))
+        pid = row[1]
+        if pid:
+            pname = row[2]
+            ppid = row[5] if has_parent_ref else None
+            start_time = _to_us_timestamp_cached(row[3], ts_cache)
+            end_time = _to_us_timestamp_cached(row[4], ts_cache)
+
+            key = (pid, pname, ppid, start_time, end_time)
+            position = proc_index.get(key)
+            if position is None:
+                rid_lists, pnames, ppids, start_times, end_times = pid2procs.setdefault(
+                    pid, _new_proc_group()
+                )
+                proc_index[key] = len(rid_lists)
+                rid_lists.append([row[0]])
+                pnames.append(pname)
+                ppids.append(ppid)
+                start_times.append(start_time)
+                end_times.append(end_time)
+            else:
+                pid2procs[pid][0][position].append(row[0])
 
     return pid2procs
 
 
-def _search_for_potential_identical_process(ref_pid2procs, fil_pid2procs, config):
-    # ref_pid2procs: {"pid":(rid, (proc_details))} for reference
-    # fil_pid2procs: {"pid":(rid, (proc_details))} to search
+def _fetch_rows_positional(store, query, has_parent_ref):
+    # row dicts pay one hashed lookup per field access; plain tuples are
+    # C-level slot accesses, so skip the dict row factory where the
+    # backend (SQLite) allows a per-cursor override; psycopg2 ignores
+    # cursor.row_factory, so other backends map their dict rows once
+    if store.dialect == "sqlite3":
+        query_text, query_values = query.render(store.placeholder, store.dialect)
+        cursor = store.connection.cursor()
+        cursor.row_factory = None
+        cursor.execute(query_text, query_values)
+        return cursor.fetchall()
+
+    if has_parent_ref:
+        return [
+            (
+                row["id"],
+                row["pid"],
+                row["name"],
+                row["first_observed"],
+                row["last_observed"],
+                row["ppid"],
+            )
+            for row in store.run_query(query).fetchall()
+        ]
+    return [
+        (
+            row["id"],
+            row["pid"],
+            row["name"],
+            row["first_observed"],
+            row["last_observed"],
+        )
+        for row in store.run_query(query).fetchall()
+    ]
 
-    res_pid2procs = defaultdict(list)
 
-    for (pid, fil_procs) in fil_pid2procs.items():
-        for rid, fil_row in fil_procs:
-            for _, ref_row in ref_pid2procs[pid]:
-                if _identical_process_check(fil_row, ref_row, config):
-                    res_pid2procs[pid].append((rid, fil_row))
-                    break
+def _config_offsets_in_us(config):
+    # config offsets are in seconds; timestamps in microseconds
+    return (
+        config["pid_but_name_changed_time_begin_offset"] * 1_000_000,
+        config["pid_but_name_changed_time_end_offset"] * 1_000_000,
+        config["pid_and_name_time_begin_offset"] * 1_000_000,
+        config["pid_and_name_time_end_offset"] * 1_000_000,
+        config["pid_and_ppid_time_begin_offset"] * 1_000_000,
+        config["pid_and_ppid_time_end_offset"] * 1_000_000,
+        config["pid_and_name_and_ppid_time_begin_offset"] * 1_000_000,
+        config["pid_and_name_and_ppid_time_end_offset"] * 1_000_000,
+    )
 
-    return res_pid2procs
 
+def _search_for_potential_identical_process(ref_pid2procs, fil_pid2procs, offsets):
+    # ref_pid2procs: {pid: (rid_lists, pnames, ppids, start_times, end_times)} for reference
+    # fil_pid2procs: {pid: (rid_lists, pnames, ppids, start_times, end_times)} to search
+    #
+    # two-step search per pid, done in a single pass over the pid groups:
+    # 1. anchor process search (fil rows matching the reference rows)
+    # 2. precise process search (fil rows matching the anchor rows), so a
+    #    process record is kept even when only its before-name-change or
+    #    after-name-change sibling matched the reference directly
+    # anchors are fil rows, so step 2 reuses the fil arrays as boolean
+    # slices instead of rebuilding and re-encoding anchor groups
+    #
+    # return: (filtered_ids, anchor_cnt, prefetched_cnt); filtered_ids is
+    # an insertion-ordered {rid: None} dedup dict
+
+    filtered_ids = {}
+    anchor_cnt = 0
+    prefetched_cnt = 0
+
+    # shared value-to-int32-code tables so the match kernel compares
+    # primitive integer arrays instead of Python objects
+    pname_codes = {}
+    ppid_codes = {}
 
-def _identical_process_check(fil_row, ref_row, config):
-    pbnc_bo = datetime.timedelta(
-        seconds=config["pid_but_name_changed_time_begin_offset"]
-    )
-    pbnc_eo = datetime.timedelta(seconds=config["pid_but_name_changed_time_end_offset"])
-    pan_bo = datetime.timedelta(seconds=config["pid_and_name_time_begin_offset"])
-    pan_eo = datetime.timedelta(seconds=config["pid_and_name_time_end_offset"])
-    pap_bo = datetime.timedelta(seconds=config["pid_and_ppid_time_begin_offset"])
-    pap_eo = datetime.timedelta(seconds=config["pid_and_ppid_time_end_offset"])
-    panap_bo = datetime.timedelta(
-        seconds=config["pid_and_name_and_ppid_time_begin_offset"]
+    for (pid, fil_procs) in fil_pid2procs.items():
+        fil_rid_lists = fil_procs[0]
+        prefetched_cnt += sum(map(len, fil_rid_lists))
+
+        ref_procs = ref_pid2procs.get(pid)
+        if ref_procs is None:
+            continue
+
+        fil_arrays = _group_as_arrays(fil_procs, pname_codes, ppid_codes)
+        ref_arrays = _group_as_arrays(ref_procs, pname_codes, ppid_codes)
+
+        anchor_mask = _identical_process_check(fil_arrays, ref_arrays, offsets)
+        if not anchor_mask.any():
+            continue
+        anchor_cnt += sum(len(fil_rid_lists[i]) for i in np.nonzero(anchor_mask)[0])
+
+        anchor_arrays = tuple(arr[anchor_mask] for arr in fil_arrays)
+        matches = _identical_process_check(fil_arrays, anchor_arrays, offsets)
+        for i in np.nonzero(matches)[0]:
+            for rid in fil_rid_lists[i]:
+                filtered_ids[rid] = None
+
+    return filtered_ids, anchor_cnt, prefetched_cnt
+
+
+def _encode_as_int32(values, codes):
+    # falsy values (absent name/ppid) encode as -1 so the kernel can test
+    # presence with a plain >= 0 comparison
+    encoded = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        if value:
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(codes)
+            encoded[i] = code
+        else:
+            encoded[i] = -1
+    return encoded
+
+
+def _group_as_arrays(procs, pname_codes, ppid_codes):
+    # one pid group of parallel lists as NumPy arrays for bulk comparison:
+    # names/ppids as int32 codes, timestamps as int64 POSIX microseconds
+    (_, pnames, ppids, start_times, end_times) = procs
+    return (
+        _encode_as_int32(pnames, pname_codes),
+        _encode_as_int32(ppids, ppid_codes),
+        np.array(start_times, dtype=np.int64),
+        np.array(end_times, dtype=np.int64),
     )
-    panap_eo = datetime.timedelta(
-        seconds=config["pid_and_name_and_ppid_time_end_offset"]
+
+
+def _identical_process_check(fil_arrays, ref_arrays, offsets):
+    # compute the boolean match matrix between all fil rows and all ref
+    # rows of one pid in C-level broadcast operations, then reduce over
+    # the ref axis
+    # return: boolean array marking each fil row with a matching ref row
+    (
+        pbnc_bo,
+        pbnc_eo,
+        pan_bo,
+        pan_eo,
+        pap_bo,
+        pap_eo,
+        panap_bo,
+        panap_eo,
+    ) = offsets
+
+    (fil_pnames, fil_ppids, fil_st, fil_ed) = fil_arrays
+    (ref_pnames, ref_ppids, ref_st, ref_ed) = ref_arrays
+
+    fil_pnames = fil_pnames[:, None]
+    fil_ppids = fil_ppids[:, None]
+    fil_st = fil_st[:, None]
+    fil_ed = fil_ed[:, None]
+
+    pname_eq = (fil_pnames == ref_pnames[None, :]) & (fil_pnames >= 0)
+    ppid_eq = (fil_ppids == ref_ppids[None, :]) & (fil_ppids >= 0)
+
+    match = (
+        pname_eq & ppid_eq & (fil_st > ref_st + panap_bo) & (fil_st < ref_ed + panap_eo)
     )
+    match |= pname_eq & (fil_st > ref_st + pan_bo) & (fil_st < ref_ed + pan_eo)
+    match |= ppid_eq & (fil_st > ref_st + pap_bo) & (fil_st < ref_ed + pap_eo)
+    # name changed process, Linux fork+exec handled
+    match |= (fil_st > ref_st + pbnc_bo) & (fil_st < ref_ed + pbnc_eo)
+    match |= (fil_ed > ref_st + pbnc_bo) & (fil_ed < ref_ed + pbnc_eo)
 
-    fil_pname, fil_ppid, fil_start_time, fil_end_time = fil_row
-    ref_pname, ref_ppid, ref_start_time, ref_end_time = ref_row
-    if (
-        (
-            fil_pname
-            and fil_ppid
-            and fil_pname == ref_pname
-            and fil_ppid == ref_ppid
-            and fil_start_time > ref_start_time + panap_bo
-            and fil_start_time < ref_end_time + panap_eo
-        )
-        or (
-            fil_pname
-            and fil_pname == ref_pname
-            and fil_start_time > ref_start_time + pan_bo
-            and fil_start_time < ref_end_time + pan_eo
-        )
-        or (
-            fil_ppid
-            and fil_ppid == ref_ppid
-            and fil_start_time > ref_start_time + pap_bo
-            and fil_start_time < ref_end_time + pap_eo
-        )
-        or (
-            # name changed process, Linux fork+exec handled
-            fil_start_time > ref_start_time + pbnc_bo
-            and fil_start_time < ref_end_time + pbnc_eo
-        )
-        or (
-            # name changed process, Linux fork+exec handled
-            fil_end_time > ref_start_time + pbnc_bo
-            and fil_end_time < ref_end_time + pbnc_eo
-        )
-    ):
-        return True
-    else:
-        return False
+    return match.any(axis=1)
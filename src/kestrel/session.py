@@ -76,6 +76,7 @@ from kestrel.syntax.utils import (
 )
 from kestrel.semantics.processor import semantics_processing
 from kestrel.codegen import commands
+from kestrel.codegen.relations import clear_relations_caches
 from kestrel.codegen.display import DisplayBlockSummary
 from kestrel.codegen.summary import gen_variable_summary
 from kestrel.symboltable.symtable import SymbolTable
@@ -511,6 +512,10 @@ class Session(AbstractContextManager):
         start_exec_ts = time.time()
         for stmt in ast:
 
+            # scope cached store query results to one statement: a statement
+            # can re-assign a variable, recreating its view with new data
+            clear_relations_caches()
+
             try:
                 # semantic checking and unfolding
                 semantics_processing(
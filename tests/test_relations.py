@@ -0,0 +1,116 @@
+import json
+import uuid
+
+import pytest
+from firepit import get_storage
+
+from kestrel.codegen.relations import fine_grained_relational_process_filtering
+
+CONFIG = {
+    "pid_but_name_changed_time_begin_offset": -5,
+    "pid_but_name_changed_time_end_offset": 5,
+    "pid_and_name_time_begin_offset": -3600,
+    "pid_and_name_time_end_offset": 3600,
+    "pid_and_ppid_time_begin_offset": -3600,
+    "pid_and_ppid_time_end_offset": 3600,
+    "pid_and_name_and_ppid_time_begin_offset": -86400,
+    "pid_and_name_and_ppid_time_end_offset": 86400,
+}
+
+
+class _Variable:
+    def __init__(self, store, entity_table, entity_type):
+        self.store = store
+        self.entity_table = entity_table
+        self.type = entity_type
+
+
+def _observed_data(first_observed, last_observed, objects):
+    return {
+        "type": "observed-data",
+        "id": "observed-data--" + str(uuid.uuid4()),
+        "created": first_observed,
+        "modified": first_observed,
+        "first_observed": first_observed,
+        "last_observed": last_observed,
+        "number_observed": 1,
+        "objects": objects,
+    }
+
+
+@pytest.fixture
+def proc_store(tmp_path):
+    # reference process: cmd.exe (pid 100) observed 12:00:00-12:00:10
+    # cmd2.exe: same pid starting 3s later, i.e. pid reuse within the
+    #   name-change window, so it is the same process after a rename
+    # late.exe: same pid two hours later, i.e. unrelated pid reuse
+    # other.exe: pid absent from the reference variable
+    bundle = {
+        "type": "bundle",
+        "id": "bundle--" + str(uuid.uuid4()),
+        "spec_version": "2.0",
+        "objects": [
+            _observed_data(
+                "2020-06-30T12:00:00.000Z",
+                "2020-06-30T12:00:10.000Z",
+                {
+                    "0": {
+                        "type": "process",
+                        "pid": 100,
+                        "name": "cmd.exe",
+                        "parent_ref": "1",
+                    },
+                    "1": {"type": "process", "pid": 1, "name": "explorer.exe"},
+                },
+            ),
+            _observed_data(
+                "2020-06-30T12:00:03.000Z",
+                "2020-06-30T12:00:08.000Z",
+                {"0": {"type": "process", "pid": 100, "name": "cmd2.exe"}},
+            ),
+            _observed_data(
+                "2020-06-30T14:00:00.000Z",
+                "2020-06-30T14:00:10.000Z",
+                {"0": {"type": "process", "pid": 100, "name": "late.exe"}},
+            ),
+            _observed_data(
+                "2020-06-30T12:00:00.000Z",
+                "2020-06-30T12:00:10.000Z",
+                {"0": {"type": "process", "pid": 200, "name": "other.exe"}},
+            ),
+        ],
+    }
+    bundle_file = tmp_path / "procs.json"
+    bundle_file.write_text(json.dumps(bundle))
+    store = get_storage(str(tmp_path / "procs.db"))
+    store.cache("q1", [str(bundle_file)])
+    store.extract("refs", "process", "q1", "[process:name = 'cmd.exe']")
+    store.extract("prefetched", "process", "q1", "[process:pid > 0]")
+    return store
+
+
+def test_filtering_keeps_reference_and_renamed_process(proc_store):
+    var = _Variable(proc_store, "refs", "process")
+    ids = fine_grained_relational_process_filtering(
+        var, "prefetched", proc_store, CONFIG
+    )
+    id2name = {row["id"]: row["name"] for row in proc_store.lookup("prefetched")}
+    assert {id2name[x] for x in ids} == {"cmd.exe", "cmd2.exe"}
+
+
+def test_filtering_drops_pid_not_in_reference(proc_store):
+    var = _Variable(proc_store, "refs", "process")
+    ids = fine_grained_relational_process_filtering(
+        var, "prefetched", proc_store, CONFIG
+    )
+    id2name = {row["id"]: row["name"] for row in proc_store.lookup("prefetched")}
+    assert "other.exe" not in {id2name[x] for x in ids}
+
+
+def test_filtering_returns_deduplicated_ids(proc_store):
+    var = _Variable(proc_store, "refs", "process")
+    ids = fine_grained_relational_process_filtering(
+        var, "prefetched", proc_store, CONFIG
+    )
+    assert len(ids) == len(set(ids))
+    assert set(ids) <= {row["id"] for row in proc_store.lookup("prefetched")}